@@ -252,19 +252,8 @@ def output_section(df):
     filename = f"freee_import_check_{timestamp}.xlsx"
 
     # ExcelWriterを使ってメモリ上でファイルを生成
-    buffer = io.BytesIO()
     writer_obj = ExcelWriter()
-
-    # 一時ファイルとして保存してからメモリに読み込む
-    import tempfile
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-        writer_obj.write_to_excel(df, tmp.name)
-        tmp.seek(0)
-        with open(tmp.name, 'rb') as f:
-            buffer.write(f.read())
-        os.unlink(tmp.name)
-
-    buffer.seek(0)
+    buffer = writer_obj.write_to_stream(df)
 
     # ダウンロードボタン
     st.download_button(
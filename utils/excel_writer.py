@@ -2,10 +2,20 @@
 Excel出力ユーティリティ
 DataFrameをExcelに出力し、色分けを行う
 """
+import io
+import re
+import numpy as np
 import pandas as pd
+import pyexcelerate
+import xlsxwriter
+from pyexcelerate.Border import Border as PyExcelerateBorder
+from pyexcelerate.Borders import Borders as PyExcelerateBorders
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Border, Side, Alignment
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Border, Side, Alignment, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.utils import get_column_letter
 
 
 class ExcelWriter:
@@ -19,15 +29,71 @@ class ExcelWriter:
     COLOR_BLUE = 'DDEBF7'    # 部門候補1（青色）
     COLOR_BLUE_LIGHT = 'F0F6FC'    # 部門元・候補2-3（薄い青色）
     COLOR_WHITE = 'FFFFFF'   # デフォルト（白）
+    COLOR_HEADER = 'D9D9D9'  # ヘッダー行（灰色）
+
+    # 色分けの色番号（色番号の配列で色分けを計算する、0は色なし）
+    COLOR_CODES = (
+        None,
+        COLOR_GREEN,
+        COLOR_RED,
+        COLOR_YELLOW,
+        COLOR_YELLOW_LIGHT,
+        COLOR_BLUE,
+        COLOR_BLUE_LIGHT,
+    )
+
+    # 行の高さ（デフォルトの行の高さ15の1.5倍）
+    ROW_HEIGHT = 15 * 1.5
+
+    # 列幅（最大60、最小10）と、表示幅に加える余白
+    COLUMN_WIDTH_MAX = 60
+    COLUMN_WIDTH_MIN = 10
+    COLUMN_WIDTH_PADDING = 2
+
+    # 数値列の表示幅（標準の表示形式で表示される数値の最大文字数、9桁の三桁カンマ区切りも収まる）
+    NUMERIC_TEXT_WIDTH = 11
+
+    # 完全一致フラグ列（色分けの判定に使う列）
+    MATCH_FLAG_COLUMNS = ['_取引先完全一致', '_部門完全一致']
+
+    # 日本語文字（ASCII以外の文字）
+    NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+    # セルに適用するスタイル（一度だけ作成して全セルで使い回す）
+    _FILLS = {
+        color: PatternFill(start_color=color, end_color=color, fill_type='solid')
+        for color in (
+            COLOR_GREEN,
+            COLOR_RED,
+            COLOR_YELLOW,
+            COLOR_YELLOW_LIGHT,
+            COLOR_BLUE,
+            COLOR_BLUE_LIGHT,
+        )
+    }
+    _HEADER_FILL = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type='solid')
+    _HEADER_FONT = Font(bold=True)
+    _THIN_BORDER = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    _ALIGN_LEFT = Alignment(horizontal='left', vertical='center')
+    _ALIGN_RIGHT = Alignment(horizontal='right', vertical='center')
 
     def __init__(self):
         self.wb = None
         self.ws = None
+        self.style_names = {}
 
     def write_to_excel(self, df, output_path, sheet_name='Sheet1'):
         """
         DataFrameをExcelに出力し、色分けを行う
 
+        書き込み専用モードでセルを1行ずつ書き出すため、
+        色・罫線・配置などのスタイルは書き込み前にすべて決定する
+
         Args:
             df: 出力するDataFrame
             output_path: 出力先ファイルパス
@@ -36,82 +102,524 @@ class ExcelWriter:
         Returns:
             str: 出力先ファイルパス
         """
-        # 新しいワークブックを作成
-        self.wb = Workbook()
-        self.ws = self.wb.active
-        self.ws.title = sheet_name
+        # 書き込み専用のワークブックを作成
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet(sheet_name)
 
-        # DataFrameをワークシートに書き込み
-        columns = list(df.columns)
-        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-            for c_idx, value in enumerate(row, 1):
-                cell = self.ws.cell(row=r_idx, column=c_idx, value=value)
-
-                # ヘッダー行のスタイル
-                if r_idx == 1:
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color='D9D9D9', end_color='D9D9D9', fill_type='solid')
-                # データ行で金額列の場合
-                elif r_idx > 1 and c_idx <= len(columns):
-                    col_name = columns[c_idx - 1]
-                    if '金額' in col_name:
-                        # 数値の場合、三桁カンマと右揃えを適用
-                        if isinstance(value, (int, float)) and pd.notna(value):
-                            cell.number_format = '#,##0'
-                            cell.alignment = Alignment(horizontal='right', vertical='center')
+        # セルのスタイルを名前付きスタイルとして登録
+        self.style_names = self._add_named_styles()
 
+        # 列ごとの判定結果を事前に作成
+        column_info = self._get_column_info(list(df.columns))
+
+        # 行の高さ・列幅・非表示列は最初の行を書き込む前に設定する
         # 行の高さを1.5倍に設定
-        self._set_row_height(df)
+        self._set_row_height()
 
         # 列幅を自動調整
-        self._auto_fit_columns(df)
+        self._auto_fit_columns(df, column_info)
 
-        # 色分けを適用
-        self._apply_colors(df)
+        # フラグ列（_で始まる列）を非表示にする
+        self._hide_flag_columns(column_info)
 
-        # 罫線を適用
-        self._apply_borders(df)
+        # 候補列に色を付ける
+        self._color_candidate_columns(len(df), column_info)
+
+        # ヘッダー行・データ行をスタイル付きで書き込み
+        self._write_styled(df, column_info)
 
         # ファイルを保存
-        self.wb.save(output_path)
+        self._save_buffered(self.wb, output_path)
 
         return output_path
 
-    def _set_row_height(self, df):
+    def _write_styled(self, df, column_info):
         """
-        行の高さを1.5倍に設定
+        ヘッダー行とデータ行をスタイル付きで書き込む
+
+        色・金額列かどうかは事前に決定しておき、値の書き込みと
+        色・罫線・配置・表示形式の設定を1回の走査で行う
 
         Args:
             df: DataFrame
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
+        """
+        columns = list(df.columns)
+
+        # 色分けを事前に決定
+        # 候補列の色は条件付き書式で付けるため、セルには行の色のみを設定する
+        color_matrix = self._get_color_matrix(df, column_info, include_column_colors=False)
+        amount_columns = column_info['amount']
+
+        # ヘッダー行を書き込み
+        self.ws.append([self._make_header_cell(col_name) for col_name in columns])
+
+        # データ行を書き込み（名前なしのタプルで1行ずつ取り出す）
+        rows = df.itertuples(index=False, name=None)
+        for color_codes, row in zip(color_matrix.tolist(), rows):
+            row_cells = []
+            for color_code, is_amount, value in zip(color_codes, amount_columns, row):
+                row_cells.append(self._make_data_cell(value, is_amount, self.COLOR_CODES[color_code]))
+            self.ws.append(row_cells)
+
+    def write_to_excel_pyexcelerate(self, df, output_path, sheet_name='Sheet1'):
+        """
+        PyExcelerateを使ってDataFrameをExcelに出力し、色分けを行う
+
+        write_to_excelと同じ色分け・罫線・書式で出力する
+        スタイルを色ごとに使い回すため、openpyxlより高速に書き込める
+
+        Args:
+            df: 出力するDataFrame
+            output_path: 出力先ファイルパス
+            sheet_name: シート名
+
+        Returns:
+            str: 出力先ファイルパス
+        """
+        wb = self._build_pyexcelerate_workbook(df, sheet_name)
+
+        # ファイルを保存
+        self._save_buffered(wb, output_path)
+
+        return output_path
+
+    def write_to_stream(self, df, sheet_name='Sheet1'):
+        """
+        DataFrameを色分け付きのExcelとしてメモリ上に出力
+
+        ファイルに保存せずにダウンロードやアップロードへ渡す場合に使う
+
+        Args:
+            df: 出力するDataFrame
+            sheet_name: シート名
+
+        Returns:
+            io.BytesIO: Excelファイルの内容（先頭にシーク済み）
+        """
+        wb = self._build_pyexcelerate_workbook(df, sheet_name)
+
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        buffer.seek(0)
+
+        return buffer
+
+    def _build_pyexcelerate_workbook(self, df, sheet_name):
+        """
+        PyExcelerateのワークブックを作成し、色分け・書式を設定
+
+        Args:
+            df: 出力するDataFrame
+            sheet_name: シート名
+
+        Returns:
+            pyexcelerate.Workbook: 作成したワークブック
+        """
+        columns = list(df.columns)
+        column_info = self._get_column_info(columns)
+        styles = self._make_pyexcelerate_styles()
+
+        # ヘッダー行 + データ行の2次元リストを作成（欠損値は空セルにする）
+        data = [columns]
+        data.extend(df.astype(object).where(df.notna(), None).values.tolist())
+
+        wb = pyexcelerate.Workbook()
+        ws = wb.new_sheet(sheet_name, data=data)
+
+        # ヘッダー行のスタイル
+        for col_idx in range(1, len(columns) + 1):
+            ws.set_cell_style(1, col_idx, styles['header'])
+
+        # データ行のスタイル（同じスタイルのセルをまとめて設定）
+        style_codes = self._get_style_codes(df, column_info)
+        for style_code in np.unique(style_codes).tolist():
+            style = styles[self._decode_style_code(style_code)]
+            row_indices, col_indices = np.nonzero(style_codes == style_code)
+            for row_idx, col_idx in zip(row_indices.tolist(), col_indices.tolist()):
+                ws.set_cell_style(row_idx + 2, col_idx + 1, style)
+
+        # 行の高さを1.5倍に設定
+        ws.set_row_style(range(1, len(df) + 2), pyexcelerate.Style(size=self.ROW_HEIGHT))
+
+        # 列幅を自動調整し、フラグ列（_で始まる列）は幅0で非表示にする
+        for col_idx, (is_flag, width) in enumerate(zip(column_info['flag'], self._get_column_widths(df, column_info)), 1):
+            size = 0 if is_flag else width
+            ws.set_col_style(col_idx, pyexcelerate.Style(size=size))
+
+        return wb
+
+    def _save_buffered(self, wb, output_path):
+        """
+        ワークブックをメモリ上に保存してから、まとめてファイルに書き込む
+
+        ZIPの書き込みで発生する細かい書き込みをメモリ上で済ませ、
+        ネットワーク上の保存先などでも書き込み回数を抑える
+
+        Args:
+            wb: 保存するワークブック（openpyxl/PyExcelerate）
+            output_path: 出力先ファイルパス
+        """
+        buffer = io.BytesIO()
+        wb.save(buffer)
+
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.write(buffer.getbuffer())
+
+    def write_to_excel_xlsxwriter(self, df, output_path, sheet_name='Sheet1'):
+        """
+        XlsxWriterを使ってDataFrameをExcelに出力し、色分けを行う
+
+        write_to_excelと同じ色分け・罫線・書式で出力する
+        constant_memoryモードで1行ずつファイルに書き出すため、
+        行数が多い場合もメモリ使用量が増えない
+
+        Args:
+            df: 出力するDataFrame
+            output_path: 出力先ファイルパス
+            sheet_name: シート名
+
+        Returns:
+            str: 出力先ファイルパス
+        """
+        columns = list(df.columns)
+        column_info = self._get_column_info(columns)
+
+        # 文字列は数値・数式・URLに変換せず、そのまま書き込む
+        wb = xlsxwriter.Workbook(output_path, {
+            'constant_memory': True,
+            'strings_to_numbers': False,
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        ws = wb.add_worksheet(sheet_name)
+        formats = self._make_xlsxwriter_formats(wb)
+
+        # 行は順番にしか書き込めないため、色分け・書式はすべて事前に決定する
+        style_codes = self._get_style_codes(df, column_info)
+
+        # 行の高さを1.5倍に設定
+        ws.set_default_row(self.ROW_HEIGHT)
+
+        # 列幅を自動調整し、フラグ列（_で始まる列）は非表示にする
+        widths = self._get_column_widths(df, column_info)
+        for col_idx, (is_flag, width) in enumerate(zip(column_info['flag'], widths)):
+            ws.set_column(col_idx, col_idx, width, None, {'hidden': is_flag})
+
+        # ヘッダー行を書き込み
+        for col_idx, col_name in enumerate(columns):
+            ws.write(0, col_idx, col_name, formats['header'])
+
+        # データ行を書き込み（欠損値は空セルにする）
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        for row_idx, (codes, row) in enumerate(zip(style_codes.tolist(), rows), 1):
+            for col_idx, (style_code, value) in enumerate(zip(codes, row)):
+                ws.write(row_idx, col_idx, value, formats[style_code])
+
+        wb.close()
+
+        return output_path
+
+    def _make_xlsxwriter_formats(self, wb):
+        """
+        XlsxWriter用の書式を作成
+
+        Args:
+            wb: XlsxWriterのワークブック
+
+        Returns:
+            dict: 'header' およびスタイル番号（_get_style_codesの要素）をキーとする書式
+        """
+        formats = {
+            'header': wb.add_format({
+                'bold': True,
+                'bg_color': f'#{self.COLOR_HEADER}',
+                'border': 1,
+                'align': 'left',
+                'valign': 'vcenter',
+            })
+        }
+
+        for style_code in range(len(self.COLOR_CODES) * 4):
+            color, is_amount, is_number = self._decode_style_code(style_code)
+            # 数値は金額列のみ（金額列以外の数値のスタイル番号は使われない）
+            if is_number and not is_amount:
+                continue
+            properties = {
+                'border': 1,
+                'align': 'right' if is_amount else 'left',
+                'valign': 'vcenter',
+            }
+            if color:
+                properties['bg_color'] = f'#{color}'
+            if is_number:
+                properties['num_format'] = '#,##0'
+            formats[style_code] = wb.add_format(properties)
+
+        return formats
+
+    def write(self, df, output_path, format='xlsx', sheet_name='Sheet1'):
         """
-        # デフォルトの行の高さは15、1.5倍にする
-        default_height = 15
-        new_height = default_height * 1.5
+        指定した形式でDataFrameを出力
 
-        # すべての行に適用（ヘッダー含む）
-        for row_idx in range(1, len(df) + 2):  # ヘッダー + データ行
-            self.ws.row_dimensions[row_idx].height = new_height
+        Excelで目視確認する場合は'xlsx'、別のプログラムで読み込む場合は
+        'parquet'または'feather'を指定する
+
+        Args:
+            df: 出力するDataFrame
+            output_path: 出力先ファイルパス
+            format: 出力形式（'xlsx', 'parquet', 'feather'）
+            sheet_name: シート名（'xlsx'の場合のみ使用）
+
+        Returns:
+            str: 出力先ファイルパス
+
+        Raises:
+            ValueError: 未対応の出力形式が指定された場合
+        """
+        if format == 'xlsx':
+            return self.write_to_excel_pyexcelerate(df, output_path, sheet_name=sheet_name)
+        if format == 'parquet':
+            return self.write_to_parquet(df, output_path)
+        if format == 'feather':
+            return self.write_to_feather(df, output_path)
+
+        raise ValueError(f"未対応の出力形式です: {format}")
+
+    def write_to_parquet(self, df, output_path, compression='zstd'):
+        """
+        DataFrameをParquet形式で出力
+
+        Args:
+            df: 出力するDataFrame
+            output_path: 出力先ファイルパス
+            compression: 圧縮方式
+
+        Returns:
+            str: 出力先ファイルパス
+        """
+        self._to_columnar(df).to_parquet(output_path, engine='pyarrow', compression=compression, index=False)
+        return output_path
+
+    def write_to_feather(self, df, output_path):
+        """
+        DataFrameをFeather形式で出力
+
+        Args:
+            df: 出力するDataFrame
+            output_path: 出力先ファイルパス
+
+        Returns:
+            str: 出力先ファイルパス
+        """
+        self._to_columnar(df).to_feather(output_path)
+        return output_path
 
-    def _auto_fit_columns(self, df):
+    def _to_columnar(self, df):
+        """
+        Parquet/Feather出力用にDataFrameを変換
+
+        完全一致フラグ列はbool型にそろえ、読み込み側で
+        Excel出力と同じ色分けを再現できるようにする
+
+        Args:
+            df: DataFrame
+
+        Returns:
+            pd.DataFrame: 変換後のDataFrame
+        """
+        result = df.reset_index(drop=True)
+
+        flag_columns = [col for col in self.MATCH_FLAG_COLUMNS if col in result.columns]
+        if flag_columns:
+            result = result.astype({col: bool for col in flag_columns})
+
+        return result
+
+    def _make_pyexcelerate_styles(self):
+        """
+        PyExcelerate用のスタイルを作成
+
+        Returns:
+            dict: 'header' および (色コード, 金額列か, 数値か) をキーとするスタイル
+        """
+        thin = PyExcelerateBorder(style='thin')
+        borders = PyExcelerateBorders(left=thin, right=thin, top=thin, bottom=thin)
+        align_left = pyexcelerate.Alignment(horizontal='left', vertical='center')
+        align_right = pyexcelerate.Alignment(horizontal='right', vertical='center')
+        amount_format = pyexcelerate.Format('#,##0')
+
+        palette = [
+            self.COLOR_GREEN,
+            self.COLOR_RED,
+            self.COLOR_YELLOW,
+            self.COLOR_YELLOW_LIGHT,
+            self.COLOR_BLUE,
+            self.COLOR_BLUE_LIGHT,
+            self.COLOR_HEADER,
+        ]
+        # 色コード（16進数）をRGBに変換して塗りつぶしを作成（色なしはNone）
+        fills = {None: None}
+        for color in palette:
+            fills[color] = pyexcelerate.Fill(background=pyexcelerate.Color(*bytes.fromhex(color)))
+
+        styles = {
+            'header': pyexcelerate.Style(
+                font=pyexcelerate.Font(bold=True),
+                fill=fills[self.COLOR_HEADER],
+                alignment=align_left,
+                borders=borders
+            )
+        }
+
+        for color, fill in fills.items():
+            if color == self.COLOR_HEADER:
+                continue
+            styles[(color, False, False)] = pyexcelerate.Style(fill=fill, alignment=align_left, borders=borders)
+            styles[(color, True, False)] = pyexcelerate.Style(fill=fill, alignment=align_right, borders=borders)
+            styles[(color, True, True)] = pyexcelerate.Style(
+                fill=fill, alignment=align_right, borders=borders, format=amount_format
+            )
+
+        return styles
+
+    def _add_named_styles(self):
+        """
+        セルに適用するスタイルを名前付きスタイルとしてワークブックに登録
+
+        色・配置・表示形式の組み合わせごとに1つ登録しておき、
+        セルには名前を指定するだけでスタイルを適用できるようにする
+
+        Returns:
+            dict: 'header' および (色コード, 金額列か, 数値か) をキーとするスタイル名
+        """
+        style_names = {'header': 'header'}
+        self.wb.add_named_style(NamedStyle(
+            name='header',
+            font=self._HEADER_FONT,
+            fill=self._HEADER_FILL,
+            border=self._THIN_BORDER,
+            alignment=self._ALIGN_LEFT,
+            number_format='General'
+        ))
+
+        variants = [
+            # (金額列か, 数値か, 名前, 配置, 表示形式)
+            (False, False, 'text', self._ALIGN_LEFT, 'General'),
+            (True, False, 'amount', self._ALIGN_RIGHT, 'General'),
+            (True, True, 'amount_number', self._ALIGN_RIGHT, '#,##0'),
+        ]
+        for color in self.COLOR_CODES:
+            for is_amount, is_number, prefix, alignment, number_format in variants:
+                name = f'{prefix}_{color}' if color else prefix
+                self.wb.add_named_style(NamedStyle(
+                    name=name,
+                    font=DEFAULT_FONT,
+                    fill=self._FILLS[color] if color else None,
+                    border=self._THIN_BORDER,
+                    alignment=alignment,
+                    number_format=number_format
+                ))
+                style_names[(color, is_amount, is_number)] = name
+
+        return style_names
+
+    def _make_header_cell(self, col_name):
+        """
+        ヘッダー行のセルを作成
+
+        Args:
+            col_name: 列名
+
+        Returns:
+            WriteOnlyCell: スタイル適用済みのセル
+        """
+        cell = WriteOnlyCell(self.ws, value=col_name)
+        cell.style = self.style_names['header']
+        return cell
+
+    def _make_data_cell(self, value, is_amount, color):
+        """
+        データ行のセルを作成
+
+        Args:
+            value: セルの値
+            is_amount: 金額列かどうか
+            color: 背景色の色コード（Noneの場合は色なし）
+
+        Returns:
+            WriteOnlyCell: スタイル適用済みのセル
+        """
+        cell = WriteOnlyCell(self.ws, value=value)
+        # 金額列は右揃え、数値の場合は三桁カンマを適用（それ以外は左揃え）
+        is_number = is_amount and isinstance(value, (int, float)) and pd.notna(value)
+        cell.style = self.style_names[(color, is_amount, is_number)]
+        return cell
+
+    def _set_row_height(self):
+        """
+        行の高さを1.5倍に設定
+
+        全行（ヘッダー含む）が同じ高さのため、行ごとではなく
+        シートの既定の行の高さとして1回だけ設定する
+        """
+        self.ws.sheet_format.defaultRowHeight = self.ROW_HEIGHT
+        self.ws.sheet_format.customHeight = True
+
+    def _auto_fit_columns(self, df, column_info):
         """
         列幅を自動調整（日本語対応）
 
         Args:
             df: DataFrame
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
+        """
+        for col_letter, width in zip(column_info['letters'], self._get_column_widths(df, column_info)):
+            self.ws.column_dimensions[col_letter].width = width
+
+    def _get_column_widths(self, df, column_info):
+        """
+        列ごとの表示幅を計算（日本語対応）
+
+        Args:
+            df: DataFrame
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
+
+        Returns:
+            list: 列ごとの幅（最大60、最小10）
         """
-        for idx, column in enumerate(df.columns, 1):
+        # 最大幅に達する表示幅（これ以上の幅は計算しても結果が変わらない）
+        max_text_width = self.COLUMN_WIDTH_MAX - self.COLUMN_WIDTH_PADDING
+        widths = []
+
+        for column, is_flag in zip(df.columns, column_info['flag']):
+            # フラグ列は非表示にするため、幅の計算を省略して最小幅にする
+            if is_flag:
+                widths.append(self.COLUMN_WIDTH_MIN)
+                continue
+
             max_width = self._calculate_text_width(str(column))
 
-            # データの最大幅を取得
-            for value in df[column]:
-                if pd.notna(value):
-                    text_width = self._calculate_text_width(str(value))
-                    if text_width > max_width:
-                        max_width = text_width
+            values = df[column]
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                # 数値列は値を文字列にせず、固定の表示幅を使う
+                max_width = max(max_width, self.NUMERIC_TEXT_WIDTH)
+            elif max_width < max_text_width:
+                # データの最大幅を列単位でまとめて計算
+                # 最大幅に達する文字数で切り詰めるため、長い文字列があっても配列は大きくならない
+                values = values.dropna().astype(str).to_numpy(dtype=f'<U{max_text_width}')
+                if values.size > 0:
+                    # 固定長のUnicode配列を文字コード（UTF-32）の2次元配列として扱い、
+                    # 文字数 + 日本語文字数（日本語文字は2文字分）を一括で計算する
+                    char_codes = values.view(np.uint32).reshape(values.size, -1)
+                    text_widths = (char_codes != 0).sum(axis=1) + (char_codes > 127).sum(axis=1)
+                    max_width = max(max_width, int(text_widths.max()))
 
             # 最大幅を設定（最大60、最小10）
-            adjusted_width = min(max(max_width + 2, 10), 60)
-            self.ws.column_dimensions[self._get_column_letter(idx)].width = adjusted_width
+            width = max(max_width + self.COLUMN_WIDTH_PADDING, self.COLUMN_WIDTH_MIN)
+            widths.append(min(width, self.COLUMN_WIDTH_MAX))
+
+        return widths
 
     def _calculate_text_width(self, text):
         """
@@ -125,189 +633,263 @@ class ExcelWriter:
         Returns:
             float: 表示幅
         """
-        width = 0
-        for char in text:
-            # 日本語文字（ひらがな、カタカナ、漢字、全角記号）
-            if ord(char) > 127:
-                width += 2
-            else:
-                width += 1
-        return width
+        # 英数字のみの場合は文字数がそのまま表示幅になる
+        if text.isascii():
+            return len(text)
+
+        # 日本語文字（ひらがな、カタカナ、漢字、全角記号）は2文字分として数える
+        return len(text) + len(self.NON_ASCII_PATTERN.findall(text))
 
-    def _get_column_letter(self, col_idx):
+    def _get_row_color_codes(self, df):
         """
-        列番号をアルファベットに変換
+        行ごとの色を決定
+
+        ルール:
+        - 完全一致: 緑
+        - 不一致: 赤
+        - 取引先の判定がある行は取引先を優先し、ない行のみ部門で判定
 
         Args:
-            col_idx: 列番号（1始まり）
+            df: DataFrame
 
         Returns:
-            str: 列アルファベット（例: 1→A, 27→AA）
+            np.ndarray: 行ごとの色番号（COLOR_CODESの添字、色なしの場合は0）
         """
-        result = ""
-        while col_idx > 0:
-            col_idx, remainder = divmod(col_idx - 1, 26)
-            result = chr(65 + remainder) + result
-        return result
-
-    def _apply_colors(self, df):
+        columns = list(df.columns)
+        row_count = len(df)
+
+        # 完全一致フラグ列がない場合は、すべての行が色なし
+        if '_取引先完全一致' not in columns and '_部門完全一致' not in columns:
+            return np.zeros(row_count, dtype=np.int8)
+
+        # 取引先の判定対象（STREAMED元の取引先が空でない行）と完全一致フラグ
+        has_partner = np.zeros(row_count, dtype=bool)
+        is_partner_match = np.zeros(row_count, dtype=bool)
+        if '_取引先完全一致' in columns and 'STREAMED元の取引先' in columns:
+            partner = df['STREAMED元の取引先']
+            has_partner = (partner.notna() & (partner != '')).to_numpy()
+            is_partner_match = df['_取引先完全一致'].to_numpy().astype(bool)
+
+        # 部門の判定対象（STREAMED元の部門が空でない行）と完全一致フラグ
+        has_dept = np.zeros(row_count, dtype=bool)
+        is_dept_match = np.zeros(row_count, dtype=bool)
+        if '_部門完全一致' in columns and 'STREAMED元の部門' in columns:
+            dept = df['STREAMED元の部門']
+            has_dept = (dept.notna() & (dept != '')).to_numpy()
+            is_dept_match = df['_部門完全一致'].to_numpy().astype(bool)
+
+        # 取引先で色が付かない行のみ部門の色を適用
+        green = self.COLOR_CODES.index(self.COLOR_GREEN)
+        red = self.COLOR_CODES.index(self.COLOR_RED)
+        partner_codes = np.where(is_partner_match, green, red)
+        dept_codes = np.where(is_dept_match, green, red)
+        row_codes = np.where(has_partner, partner_codes, np.where(has_dept, dept_codes, 0))
+
+        return row_codes.astype(np.int8)
+
+    def _get_color_matrix(self, df, column_info, include_column_colors=True):
         """
-        色分けを適用
+        セルごとの色を決定
+
+        行ごとの色と候補列の色から、全セルの色番号を一括で計算する
 
         ルール:
-        - 完全一致: 緑
-        - 不一致: 赤
-        - 取引先候補列: 黄色
-        - 部門候補列: 青色
+        - 候補列: 列の色（行の色より優先）
+        - 行の色を適用する列: 行の色
+        - それ以外の列: 色なし
 
         Args:
             df: DataFrame
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
+            include_column_colors: 候補列の色を含めるかどうか
+                （Falseの場合、候補列は色なしになる）
+
+        Returns:
+            np.ndarray: 行数 × 列数の色番号（COLOR_CODESの添字）
         """
-        columns = list(df.columns)
+        row_codes = self._get_row_color_codes(df)
+        column_codes = np.array(
+            [self.COLOR_CODES.index(color) for color in column_info['colors']], dtype=np.int8
+        )
+        row_color_columns = np.array(column_info['row_color'], dtype=bool) & (column_codes == 0)
 
-        # 各行に対して処理
-        for row_idx in range(len(df)):
-            excel_row = row_idx + 2  # Excelの行番号（ヘッダーが1行目）
+        # (行数, 1) と (列数,) をブロードキャストして (行数, 列数) にする
+        color_matrix = np.where(row_color_columns, row_codes[:, np.newaxis], 0).astype(np.int8)
+        if include_column_colors:
+            color_matrix = np.where(column_codes > 0, column_codes, color_matrix).astype(np.int8)
 
-            # 取引先のチェック
-            if '_取引先完全一致' in columns:
-                is_partner_match = df.at[row_idx, '_取引先完全一致']
-                has_partner = df.at[row_idx, 'STREAMED元の取引先'] if 'STREAMED元の取引先' in columns else ''
+        return color_matrix
 
-                if pd.notna(has_partner) and has_partner != '':
-                    color = self.COLOR_GREEN if is_partner_match else self.COLOR_RED
-                    self._color_row(excel_row, columns, color, exclude_patterns=['候補', '_'])
+    def _get_style_codes(self, df, column_info):
+        """
+        セルごとのスタイル番号を一括で計算
 
-            # 部門のチェック
-            if '_部門完全一致' in columns:
-                is_dept_match = df.at[row_idx, '_部門完全一致']
-                has_dept = df.at[row_idx, 'STREAMED元の部門'] if 'STREAMED元の部門' in columns else ''
+        スタイル番号 = 色番号 * 4 + 金額列 * 2 + 数値（三桁カンマを適用するか）
 
-                if pd.notna(has_dept) and has_dept != '':
-                    # すでに取引先で色が付いていない場合のみ部門の色を適用
-                    if '_取引先完全一致' not in columns or pd.isna(df.at[row_idx, 'STREAMED元の取引先']) or df.at[row_idx, 'STREAMED元の取引先'] == '':
-                        color = self.COLOR_GREEN if is_dept_match else self.COLOR_RED
-                        self._color_row(excel_row, columns, color, exclude_patterns=['候補', '_'])
+        Args:
+            df: DataFrame
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
 
-        # 候補列に色を付ける
-        self._color_candidate_columns(df, columns)
+        Returns:
+            np.ndarray: 行数 × 列数のスタイル番号
+        """
+        color_matrix = self._get_color_matrix(df, column_info)
+        amount_columns = np.array(column_info['amount'], dtype=np.int64)
+        number_matrix = self._get_number_matrix(df, column_info)
+        return color_matrix.astype(np.int64) * 4 + amount_columns * 2 + number_matrix
 
-        # フラグ列（_で始まる列）を非表示にする
-        self._hide_flag_columns(columns)
+    def _decode_style_code(self, style_code):
+        """
+        スタイル番号を色・金額列・数値の組み合わせに変換
+
+        Args:
+            style_code: スタイル番号（_get_style_codesの要素）
+
+        Returns:
+            tuple: (色コード, 金額列か, 数値か)
+        """
+        color_code, amount_code = divmod(style_code, 4)
+        return self.COLOR_CODES[color_code], amount_code >= 2, amount_code % 2 == 1
 
-    def _color_row(self, excel_row, columns, color, exclude_patterns=None):
+    def _get_number_matrix(self, df, column_info):
         """
-        行全体に色を付ける
+        三桁カンマを適用するセル（金額列の数値）を判定
 
         Args:
-            excel_row: Excelの行番号
-            columns: 列名リスト
-            color: 色コード
-            exclude_patterns: 除外するパターンのリスト（列名に含まれる文字列）
+            df: DataFrame
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
+
+        Returns:
+            np.ndarray: 行数 × 列数の判定結果（0または1）
+        """
+        number_matrix = np.zeros((len(df), len(df.columns)), dtype=np.int64)
+
+        for col_idx, is_amount in enumerate(column_info['amount']):
+            if not is_amount:
+                continue
+            values = df.iloc[:, col_idx]
+            if pd.api.types.is_numeric_dtype(values):
+                is_number = values.notna()
+            else:
+                is_number = values.map(lambda value: isinstance(value, (int, float)) and pd.notna(value))
+            number_matrix[:, col_idx] = is_number.to_numpy(dtype=bool)
+
+        return number_matrix
+
+    def _is_row_color_column(self, col_name, exclude_patterns=('候補', '_')):
         """
-        if exclude_patterns is None:
-            exclude_patterns = []
+        行の色を適用する列かどうかを判定
+
+        Args:
+            col_name: 列名
+            exclude_patterns: 除外するパターンのリスト（列名に含まれる文字列）
 
-        for col_idx, col_name in enumerate(columns, 1):
-            # 除外パターンに一致する列はスキップ
-            skip = False
-            for pattern in exclude_patterns:
-                if pattern in col_name:
-                    skip = True
-                    break
+        Returns:
+            bool: 行の色を適用する場合True
+        """
+        # 除外パターンに一致する列はスキップ
+        for pattern in exclude_patterns:
+            if pattern in col_name:
+                return False
 
-            if not skip:
-                cell = self.ws.cell(row=excel_row, column=col_idx)
-                cell.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+        return True
 
-    def _hide_flag_columns(self, columns):
+    def _hide_flag_columns(self, column_info):
         """
         フラグ列（_で始まる列）を非表示にする
 
         Args:
-            columns: 列名リスト
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
         """
-        for col_idx, col_name in enumerate(columns, 1):
-            if col_name.startswith('_'):
-                col_letter = self._get_column_letter(col_idx)
+        for col_letter, is_flag in zip(column_info['letters'], column_info['flag']):
+            if is_flag:
                 self.ws.column_dimensions[col_letter].hidden = True
 
-    def _color_candidate_columns(self, df, columns):
+    def _color_candidate_columns(self, row_count, column_info):
         """
         候補列に色を付ける
 
+        列全体を同じ色で塗るため、セルごとに塗りつぶしを設定せず、
+        常に適用される条件付き書式を列ごとに1つだけ追加する
+
+        Args:
+            row_count: データ行数
+            column_info: 列ごとの判定結果（_get_column_infoの戻り値）
+        """
+        if row_count == 0:
+            return
+
+        for col_letter, color in zip(column_info['letters'], column_info['colors']):
+            if color:
+                cell_range = f'{col_letter}2:{col_letter}{row_count + 1}'  # ヘッダーを除く
+                self.ws.conditional_formatting.add(
+                    cell_range, FormulaRule(formula=['TRUE'], fill=self._FILLS[color])
+                )
+
+    def _get_column_info(self, columns):
+        """
+        列ごとの判定結果を作成
+
+        列名に対する判定（文字列の比較・検索）を列ごとに1回だけ行い、
+        書き込み時は列番号で参照できるようにする
+
         Args:
-            df: DataFrame
             columns: 列名リスト
+
+        Returns:
+            dict: 列ごとの判定結果のリスト
+                - 'colors': 候補列の色コード（候補列以外はNone）
+                - 'row_color': 行の色を適用する列かどうか
+                - 'amount': 金額列かどうか
+                - 'flag': フラグ列（_で始まる列）かどうか
+                - 'letters': 列アルファベット
+        """
+        return {
+            'colors': self._get_column_colors(columns),
+            'row_color': [self._is_row_color_column(col_name) for col_name in columns],
+            'amount': ['金額' in col_name for col_name in columns],
+            'flag': [col_name.startswith('_') for col_name in columns],
+            'letters': [get_column_letter(col_idx) for col_idx in range(1, len(columns) + 1)],
+        }
+
+    def _get_column_colors(self, columns):
+        """
+        候補列の色を決定
+
+        Args:
+            columns: 列名リスト
+
+        Returns:
+            list: 列ごとの色コード（候補列以外はNone）
         """
-        for col_idx, col_name in enumerate(columns, 1):
+        column_colors = []
+
+        for col_name in columns:
             # STREAMED元の取引先列: 薄い黄色
             if col_name == 'STREAMED元の取引先':
-                self._color_column(col_idx, len(df), self.COLOR_YELLOW_LIGHT)
+                column_colors.append(self.COLOR_YELLOW_LIGHT)
 
             # 取引先候補1: 濃い黄色
             elif col_name == '取引先候補1':
-                self._color_column(col_idx, len(df), self.COLOR_YELLOW)
+                column_colors.append(self.COLOR_YELLOW)
 
             # 取引先候補2-3: 薄い黄色
             elif col_name in ['取引先候補2', '取引先候補3']:
-                self._color_column(col_idx, len(df), self.COLOR_YELLOW_LIGHT)
+                column_colors.append(self.COLOR_YELLOW_LIGHT)
 
             # STREAMED元の部門列: 薄い青色
             elif col_name == 'STREAMED元の部門':
-                self._color_column(col_idx, len(df), self.COLOR_BLUE_LIGHT)
+                column_colors.append(self.COLOR_BLUE_LIGHT)
 
             # 部門候補1: 濃い青色
             elif col_name == '部門候補1':
-                self._color_column(col_idx, len(df), self.COLOR_BLUE)
+                column_colors.append(self.COLOR_BLUE)
 
             # 部門候補2-3: 薄い青色
             elif col_name in ['部門候補2', '部門候補3']:
-                self._color_column(col_idx, len(df), self.COLOR_BLUE_LIGHT)
-
-    def _color_column(self, col_idx, row_count, color):
-        """
-        特定の列に色を付ける
-
-        Args:
-            col_idx: 列番号（1始まり）
-            row_count: 行数
-            color: 色コード
-        """
-        for row_idx in range(2, row_count + 2):  # ヘッダーを除く
-            cell = self.ws.cell(row=row_idx, column=col_idx)
-            cell.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
-
-    def _apply_borders(self, df):
-        """
-        罫線を適用
-
-        Args:
-            df: DataFrame
-        """
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+                column_colors.append(self.COLOR_BLUE_LIGHT)
 
-        columns = list(df.columns)
+            else:
+                column_colors.append(None)
 
-        for row_idx, row in enumerate(self.ws.iter_rows(), 1):
-            for col_idx, cell in enumerate(row, 1):
-                cell.border = thin_border
-
-                # 金額列の場合は右揃えを維持、それ以外は左揃え
-                if row_idx > 1 and col_idx <= len(columns):
-                    col_name = columns[col_idx - 1]
-                    if '金額' in col_name:
-                        # 金額列は右揃えを維持
-                        if cell.alignment is None or cell.alignment.horizontal != 'right':
-                            cell.alignment = Alignment(horizontal='right', vertical='center')
-                    else:
-                        # それ以外は左揃え
-                        cell.alignment = Alignment(horizontal='left', vertical='center')
-                else:
-                    # ヘッダー行は左揃え
-                    cell.alignment = Alignment(horizontal='left', vertical='center')
+        return column_colors